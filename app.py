@@ -5,68 +5,110 @@ Flask web app for the AI Resume System. Provides a modern, minimal UI for upload
 Follows all UI Design Requirements from .cursorrules.
 """
 
-import os
-from flask import Flask, render_template, request, redirect, url_for, flash
-from werkzeug.utils import secure_filename
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from flask import Flask, Response, render_template, request, redirect, url_for, flash, stream_with_context
 from resume_parser import parse_input, InputValidationError
-from llm_orchestrator import analyze_resume, AnalysisResult
+from llm_orchestrator import analyze_resume, stream_analysis, AnalysisResult
 from output_formatter import format_human_readable_summary, format_result_as_json
-import json
 
-UPLOAD_FOLDER = 'uploads'
 ALLOWED_EXTENSIONS = {'pdf', 'docx', 'txt'}
 
+logging.basicConfig(level=logging.INFO)
+
 app = Flask(__name__)
 app.secret_key = 'stampli_secret_key'  # For flash messages
-app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
-
-os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
+def read_request_inputs():
+    """
+    Reads the job description and resume from the submitted form, either as demo text or uploaded files.
+    Returns:
+        tuple: The sanitized job description and resume texts.
+    Raises:
+        InputValidationError: If the inputs are missing or invalid (message is ready to show to the user).
+    """
+    use_demo = request.form.get('use_demo', '0') == '1'
+    if use_demo:
+        job_desc = request.form.get('job_demo', '').strip()
+        resume = request.form.get('resume_demo', '').strip()
+        if not job_desc or not resume:
+            raise InputValidationError('Demo job description and resume cannot be empty.')
+        return job_desc, resume
+    job_file = request.files.get('job')
+    resume_file = request.files.get('resume')
+    if not job_file or not allowed_file(job_file.filename):
+        raise InputValidationError('Please upload a valid job description file (PDF, DOCX, or TXT).')
+    if not resume_file or not allowed_file(resume_file.filename):
+        raise InputValidationError('Please upload a valid resume file (PDF, DOCX, or TXT).')
+    try:
+        # Parse the uploaded streams in memory instead of saving them to disk first
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            job_future = executor.submit(parse_input, job_file.stream, job_file.filename)
+            resume_future = executor.submit(parse_input, resume_file.stream, resume_file.filename)
+            return job_future.result(), resume_future.result()
+    except InputValidationError as e:
+        raise InputValidationError(f'Input error: {e}') from e
+
+def format_sse(data, event=None):
+    """
+    Formats a Server-Sent Events message. Multi-line data is split across several data fields.
+    """
+    message = f'event: {event}\n' if event else ''
+    message += ''.join(f'data: {line}\n' for line in data.split('\n'))
+    return message + '\n'
+
 @app.route('/', methods=['GET', 'POST'])
 def index():
     if request.method == 'POST':
-        use_demo = request.form.get('use_demo', '0') == '1'
-        if use_demo:
-            job_desc = request.form.get('job_demo', '').strip()
-            resume = request.form.get('resume_demo', '').strip()
-            if not job_desc or not resume:
-                flash('Demo job description and resume cannot be empty.')
-                return redirect(request.url)
-        else:
-            job_file = request.files.get('job')
-            resume_file = request.files.get('resume')
-            if not job_file or not allowed_file(job_file.filename):
-                flash('Please upload a valid job description file (PDF, DOCX, or TXT).')
-                return redirect(request.url)
-            if not resume_file or not allowed_file(resume_file.filename):
-                flash('Please upload a valid resume file (PDF, DOCX, or TXT).')
-                return redirect(request.url)
-            job_path = os.path.join(app.config['UPLOAD_FOLDER'], secure_filename(job_file.filename))
-            resume_path = os.path.join(app.config['UPLOAD_FOLDER'], secure_filename(resume_file.filename))
-            job_file.save(job_path)
-            resume_file.save(resume_path)
-            try:
-                job_desc = parse_input(job_path)
-                resume = parse_input(resume_path)
-            except InputValidationError as e:
-                flash(f'Input error: {e}')
-                return redirect(request.url)
-            except Exception as e:
-                flash(f'Unexpected error: {e}')
-                return redirect(request.url)
+        try:
+            job_desc, resume = read_request_inputs()
+        except InputValidationError as e:
+            flash(str(e))
+            return redirect(request.url)
+        except Exception as e:
+            flash(f'Unexpected error: {e}')
+            return redirect(request.url)
         try:
             result: AnalysisResult = analyze_resume(job_desc, resume)
             summary = format_human_readable_summary(result)
             json_output = format_result_as_json(result)
-            parsed_result = json.loads(json_output)
+            parsed_result = result.model_dump()
             return render_template('index.html', summary=summary, json_output=json_output, parsed_result=parsed_result, logo_url=url_for('static', filename='stampli.png'))
         except Exception as e:
             flash(f'LLM analysis error: {e}')
             return redirect(request.url)
     return render_template('index.html', summary=None, json_output=None, parsed_result=None, logo_url=url_for('static', filename='stampli.png'))
 
+@app.route('/analyze/stream', methods=['POST'])
+def analyze_stream():
+    """
+    Streams the analysis as Server-Sent Events: partial JSON content as it is generated,
+    then a 'result' event with the final validated JSON and an 'html' event with the rendered
+    result panel (or an 'error' event).
+    """
+    try:
+        job_desc, resume = read_request_inputs()
+    except InputValidationError as e:
+        return Response(format_sse(str(e), event='error'), status=400, mimetype='text/event-stream')
+    except Exception as e:
+        return Response(format_sse(f'Unexpected error: {e}', event='error'), status=500, mimetype='text/event-stream')
+
+    def generate():
+        try:
+            for item in stream_analysis(job_desc, resume):
+                if isinstance(item, AnalysisResult):
+                    json_output = format_result_as_json(item)
+                    yield format_sse(json_output, event='result')
+                    yield format_sse(render_template('result.html', summary=format_human_readable_summary(item), json_output=json_output, parsed_result=item.model_dump()), event='html')
+                else:
+                    yield format_sse(item)
+        except Exception as e:
+            yield format_sse(f'LLM analysis error: {e}', event='error')
+
+    return Response(stream_with_context(generate()), mimetype='text/event-stream')
+
 if __name__ == '__main__':
     app.run(debug=True) 
\ No newline at end of file
@@ -7,20 +7,27 @@ Tracks token usage and cost. Implements robust error handling and logging.
 """
 
 import os
+import asyncio
+import functools
 import logging
-from typing import List, Any, Dict, Optional
+import random
+import threading
+import time
+from contextlib import asynccontextmanager
+from typing import List, Any, AsyncGenerator, AsyncIterator, Coroutine, Dict, Iterator, Optional, Tuple, Type, TypeVar, Union
+import httpx
+import openai
+import orjson
 from pydantic import BaseModel, ValidationError, Field
 from langchain_openai import ChatOpenAI
 from langchain.prompts import ChatPromptTemplate
-from langchain.output_parsers import PydanticOutputParser
+from langchain_core.caches import BaseCache, InMemoryCache
+from langchain_core.outputs import Generation
 import tiktoken
 import dotenv
-import re
 
 dotenv.load_dotenv()
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 # Load OpenAI API key from environment
@@ -28,9 +35,146 @@ OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 if not OPENAI_API_KEY:
     raise EnvironmentError("OPENAI_API_KEY not found in environment variables.")
 
+# Cache validated LLM responses so identical prompts (same job description, resume and model) skip the API call.
+# Hits are served with empty token usage, so cached analyses report no cost.
+# Set LLM_CACHE_PATH to persist the cache across restarts in a SQLite database.
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH")
+_RESPONSE_CACHE: BaseCache
+if LLM_CACHE_PATH:
+    from langchain_community.cache import SQLiteCache
+    _RESPONSE_CACHE = SQLiteCache(database_path=LLM_CACHE_PATH)
+else:
+    _RESPONSE_CACHE = InMemoryCache(maxsize=1024)
+
 # Cost per 1K tokens for gpt-3.5-turbo (adjust as needed)
 COST_PER_1K_TOKENS = 0.0015
 
+# The OpenAI Batch API bills at half the on-demand price; batch jobs are polled at this interval
+BATCH_COST_MULTIPLIER = 0.5
+BATCH_POLL_INTERVAL_SECONDS = 30
+
+# Resumes shorter than this are scored without calling the LLM
+MIN_RESUME_CHARS = 200
+
+# Context window sizes per model; prompts are trimmed to leave room for the completion
+MODEL_CONTEXT_LIMITS = {
+    "gpt-3.5-turbo": 16385,
+    "gpt-4": 8192,
+    "gpt-4-turbo": 128000,
+    "gpt-4o": 128000,
+    "gpt-4o-mini": 128000,
+}
+DEFAULT_CONTEXT_LIMIT = 8192
+COMPLETION_TOKEN_RESERVE = 1024
+
+SYSTEM_PROMPT = "You are an expert HR assistant. Respond only with valid JSON as per the schema."
+
+# Maximum number of concurrent OpenAI requests when analyzing a batch
+MAX_CONCURRENT_REQUESTS = int(os.getenv("OPENAI_MAX_CONCURRENCY", "8"))
+
+# Exact-match token count cache keyed by (text hash, model), trimmed FIFO when full
+_TOKEN_COUNT_CACHE: Dict[Tuple[int, str], int] = {}
+_TOKEN_COUNT_CACHE_MAX_ENTRIES = 10_000
+
+# Maximum number of cached document profiles per event loop
+_PROFILE_CACHE_MAX_ENTRIES = 256
+
+
+class _LoopResources:
+    """
+    Async resources bound to one event loop: the pooled HTTP client, the ChatOpenAI clients using it,
+    and the in-flight/extracted document profiles (stored as tasks of that loop).
+    """
+
+    def __init__(self):
+        self.http_client = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=100)
+        )
+        # One ChatOpenAI client per model, sharing the pooled HTTP client so TCP/TLS connections are reused
+        self.llms: Dict[str, ChatOpenAI] = {}
+        # Extracted document profiles keyed by (text hash, document type, model), so the same job description
+        # is only extracted once across a batch of candidates. Tasks let concurrent callers share one call.
+        self.profiles: Dict[Tuple[int, str, str], "asyncio.Task"] = {}
+        # Number of active analyses using these resources
+        self.users = 0
+
+
+# Pooled async connections and tasks cannot be shared across event loops, so each loop gets its own
+# resources. They are reference-counted by _loop_resources: the shared background loop keeps its resources
+# for the life of the process, any other loop's are removed and closed when its last analysis finishes.
+_LOOP_RESOURCES: Dict[asyncio.AbstractEventLoop, "_LoopResources"] = {}
+
+# Background event loop used by the synchronous wrappers, so their calls share one connection pool
+# rather than starting a fresh loop (and pool) per call with asyncio.run().
+_EVENT_LOOP: Optional[asyncio.AbstractEventLoop] = None
+_EVENT_LOOP_LOCK = threading.Lock()
+
+T = TypeVar("T")
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+# OpenAI rate limits (requests and tokens per minute) and retry policy for 429s and transient errors
+OPENAI_RPM = int(os.getenv("OPENAI_RPM", "3500"))
+OPENAI_TPM = int(os.getenv("OPENAI_TPM", "90000"))
+MAX_RATE_LIMIT_RETRIES = 5
+RATE_LIMIT_BACKOFF_SECONDS = 1.0
+
+# Errors retried with backoff. The SDK's own retries are disabled (max_retries=0) so that every attempt,
+# including retries of 5xx, timeout and connection errors, goes through the token bucket.
+_RETRYABLE_ERRORS = (
+    openai.RateLimitError,
+    openai.APIConnectionError,
+    openai.APITimeoutError,
+    openai.InternalServerError,
+)
+
+
+class _TokenBucket:
+    """
+    Token-bucket rate limiter tracking request and token headroom per minute.
+    Capacity refills continuously, so callers wait only as long as needed for enough headroom.
+    """
+
+    def __init__(self, requests_per_minute: int, tokens_per_minute: int):
+        self.max_requests = float(requests_per_minute)
+        self.max_tokens = float(tokens_per_minute)
+        self.available_requests = self.max_requests
+        self.available_tokens = self.max_tokens
+        self.last_update = time.monotonic()
+        # A threading lock (held only while updating state, never across an await) keeps the bucket
+        # usable from any event loop or thread
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        elapsed = now - self.last_update
+        self.available_requests = min(self.max_requests, self.available_requests + elapsed * self.max_requests / 60)
+        self.available_tokens = min(self.max_tokens, self.available_tokens + elapsed * self.max_tokens / 60)
+        self.last_update = now
+
+    async def acquire(self, tokens: float) -> None:
+        """
+        Waits until there is headroom for one request consuming the given number of tokens.
+        Args:
+            tokens (float): Estimated tokens the request will consume.
+        """
+        # A single request larger than the whole budget would otherwise wait forever
+        tokens = min(float(tokens), self.max_tokens)
+        while True:
+            with self._lock:
+                self._refill()
+                if self.available_requests >= 1 and self.available_tokens >= tokens:
+                    self.available_requests -= 1
+                    self.available_tokens -= tokens
+                    return
+                wait = max(
+                    (1 - self.available_requests) * 60 / self.max_requests,
+                    (tokens - self.available_tokens) * 60 / self.max_tokens,
+                )
+            await asyncio.sleep(wait)
+
+
+_RATE_LIMITER = _TokenBucket(OPENAI_RPM, OPENAI_TPM)
+
 class AnalysisResult(BaseModel):
     """
     Pydantic model for the structured output of the LLM analysis.
@@ -44,55 +188,488 @@ class AnalysisResult(BaseModel):
     cost_estimate: Optional[Dict[str, Any]] = None  # Make optional
 
 
+@functools.lru_cache(maxsize=8)
+def _get_encoder(model: str) -> tiktoken.Encoding:
+    """
+    Returns the tiktoken encoder for the specified model, loading it only once per model.
+    Args:
+        model (str): The model name.
+    Returns:
+        tiktoken.Encoding: The cached encoder instance.
+    """
+    return tiktoken.encoding_for_model(model)
+
+
+class DocumentProfile(BaseModel):
+    """
+    Pydantic model for the normalized skills and experience extracted from a single document.
+    """
+    skills: List[str]
+    experience: List[str]
+
+
 def count_tokens(text: str, model: str = "gpt-3.5-turbo") -> int:
     """
     Counts the number of tokens in a text string for the specified model.
+    Results are cached by content hash so repeated texts (e.g. the same job description
+    across a batch) are only tokenized once.
     Args:
         text (str): The text to count tokens for.
         model (str): The model name (default: gpt-3.5-turbo).
     Returns:
         int: Number of tokens.
     """
-    enc = tiktoken.encoding_for_model(model)
-    return len(enc.encode(text))
+    key = (hash(text), model)
+    cached = _TOKEN_COUNT_CACHE.get(key)
+    if cached is not None:
+        return cached
+    num_tokens = len(_get_encoder(model).encode(text))
+    if len(_TOKEN_COUNT_CACHE) >= _TOKEN_COUNT_CACHE_MAX_ENTRIES:
+        # Evict the oldest entry (dicts preserve insertion order)
+        _TOKEN_COUNT_CACHE.pop(next(iter(_TOKEN_COUNT_CACHE)), None)
+    _TOKEN_COUNT_CACHE[key] = num_tokens
+    return num_tokens
+
+
+def _get_loop_resources() -> _LoopResources:
+    """
+    Returns the async resources of the running event loop, creating them on first use.
+    Returns:
+        _LoopResources: The resources bound to the running loop.
+    """
+    loop = asyncio.get_running_loop()
+    resources = _LOOP_RESOURCES.get(loop)
+    if resources is None:
+        resources = _LOOP_RESOURCES.setdefault(loop, _LoopResources())
+    return resources
+
+
+@asynccontextmanager
+async def _loop_resources() -> AsyncIterator[_LoopResources]:
+    """
+    Holds the running loop's async resources for the duration of one analysis.
+    When the last analysis on a loop other than the shared background loop finishes, its resources are
+    dropped and the pooled HTTP client is closed, so short-lived loops (e.g. asyncio.run) do not leak.
+    Yields:
+        _LoopResources: The resources bound to the running loop.
+    """
+    loop = asyncio.get_running_loop()
+    resources = _get_loop_resources()
+    resources.users += 1
+    try:
+        yield resources
+    finally:
+        resources.users -= 1
+        if resources.users == 0 and loop is not _EVENT_LOOP:
+            _LOOP_RESOURCES.pop(loop, None)
+            await resources.http_client.aclose()
 
 
-def build_prompt(job_desc: str, resume: str) -> str:
+def _get_llm(model_name: str) -> ChatOpenAI:
     """
-    Constructs the prompt for the LLM to analyze the resume against the job description.
+    Returns the ChatOpenAI client for the specified model on the running event loop, creating it on first use.
     Args:
-        job_desc (str): The job description text.
+        model_name (str): The OpenAI model to use.
+    Returns:
+        ChatOpenAI: The cached client.
+    """
+    resources = _get_loop_resources()
+    llm = resources.llms.get(model_name)
+    if llm is None:
+        # JSON mode guarantees the completion is a raw JSON object (no Markdown fences)
+        llm = resources.llms.setdefault(model_name, ChatOpenAI(
+            api_key=OPENAI_API_KEY,
+            model=model_name,
+            temperature=0.3,
+            model_kwargs={"response_format": {"type": "json_object"}},
+            stream_usage=True,
+            # Retries are handled (and charged to the token bucket) by _invoke_with_rate_limit
+            max_retries=0,
+            http_async_client=resources.http_client,
+        ))
+    return llm
+
+
+def _get_event_loop() -> asyncio.AbstractEventLoop:
+    """
+    Returns the shared background event loop, starting it on first use.
+    Returns:
+        asyncio.AbstractEventLoop: The running background loop.
+    """
+    global _EVENT_LOOP
+    with _EVENT_LOOP_LOCK:
+        if _EVENT_LOOP is None:
+            _EVENT_LOOP = asyncio.new_event_loop()
+            threading.Thread(target=_EVENT_LOOP.run_forever, name="llm-event-loop", daemon=True).start()
+    return _EVENT_LOOP
+
+
+def _run_sync(coro: Coroutine[Any, Any, T]) -> T:
+    """
+    Runs a coroutine on the shared background event loop and blocks until it completes.
+    Args:
+        coro (Coroutine): The coroutine to run.
+    Returns:
+        The coroutine's result.
+    """
+    return asyncio.run_coroutine_threadsafe(coro, _get_event_loop()).result()
+
+
+def _iterate_sync(agen: AsyncGenerator[T, None]) -> Iterator[T]:
+    """
+    Iterates an async generator on the shared background event loop from synchronous code.
+    Args:
+        agen (AsyncGenerator): The async generator to iterate.
+    Yields:
+        The generator's items, as they are produced.
+    """
+    loop = _get_event_loop()
+    try:
+        while True:
+            try:
+                yield asyncio.run_coroutine_threadsafe(agen.__anext__(), loop).result()
+            except StopAsyncIteration:
+                return
+    finally:
+        # Close the generator if the consumer stops early (e.g. the client disconnected)
+        asyncio.run_coroutine_threadsafe(agen.aclose(), loop).result()
+
+
+def _rate_limit_backoff(attempt: int, error: Exception) -> float:
+    """
+    Returns the exponential backoff with jitter before retrying a failed request, and logs the retry.
+    Args:
+        attempt (int): Zero-based index of the attempt that failed.
+        error (Exception): The retryable error (rate limit, timeout, connection or server error).
+    Returns:
+        float: Seconds to wait before retrying.
+    """
+    backoff = RATE_LIMIT_BACKOFF_SECONDS * 2 ** attempt * (1 + random.random())
+    logger.warning(
+        "OpenAI request failed (%s), retrying in %.1fs (attempt %d/%d)",
+        type(error).__name__, backoff, attempt + 1, MAX_RATE_LIMIT_RETRIES,
+    )
+    return backoff
+
+
+async def _invoke_with_rate_limit(llm: ChatOpenAI, prompt: List[Any], prompt_tokens: int) -> Any:
+    """
+    Invokes the LLM once the rate limiter has headroom, retrying with exponential backoff and jitter on 429s
+    and transient (timeout, connection, 5xx) errors.
+    Args:
+        llm (ChatOpenAI): The client to invoke.
+        prompt (List[Any]): The formatted chat messages.
+        prompt_tokens (int): Estimated prompt tokens; charged with the completion reserve against the tokens-per-minute budget.
+    Returns:
+        The LLM response message.
+    Raises:
+        openai.APIError: If the request still fails with a retryable error after all retries.
+    """
+    for attempt in range(MAX_RATE_LIMIT_RETRIES + 1):
+        await _RATE_LIMITER.acquire(tokens=prompt_tokens + COMPLETION_TOKEN_RESERVE)
+        try:
+            return await llm.ainvoke(prompt)
+        except _RETRYABLE_ERRORS as e:
+            if attempt == MAX_RATE_LIMIT_RETRIES:
+                raise
+            await asyncio.sleep(_rate_limit_backoff(attempt, e))
+
+
+async def _stream_with_rate_limit(llm: ChatOpenAI, prompt: List[Any], prompt_tokens: int) -> AsyncIterator[Any]:
+    """
+    Streams the LLM response once the rate limiter has headroom. Rate-limited and transiently failed requests
+    are retried with backoff only while nothing has been streamed yet, so callers never see duplicated chunks.
+    Args:
+        llm (ChatOpenAI): The client to stream from.
+        prompt (List[Any]): The formatted chat messages.
+        prompt_tokens (int): Estimated prompt tokens; charged with the completion reserve against the tokens-per-minute budget.
+    Yields:
+        The LLM response message chunks.
+    Raises:
+        openai.APIError: If the request still fails with a retryable error after all retries.
+    """
+    for attempt in range(MAX_RATE_LIMIT_RETRIES + 1):
+        await _RATE_LIMITER.acquire(tokens=prompt_tokens + COMPLETION_TOKEN_RESERVE)
+        started = False
+        try:
+            async for chunk in llm.astream(prompt):
+                started = True
+                yield chunk
+            return
+        except _RETRYABLE_ERRORS as e:
+            if started or attempt == MAX_RATE_LIMIT_RETRIES:
+                raise
+            await asyncio.sleep(_rate_limit_backoff(attempt, e))
+
+
+def build_extraction_prompt(text: str, document_type: str) -> str:
+    """
+    Constructs the prompt for the LLM to extract a normalized skills/experience profile from one document.
+    Args:
+        text (str): The document text.
+        document_type (str): Human-readable document type (e.g. "Job Description", "Candidate Resume").
+    Returns:
+        str: The constructed prompt.
+    """
+    return (
+        "You are an expert HR assistant. Extract the skills and experience from the following document. "
+        "Normalize each item to a short phrase. Output a JSON object with the following fields: "
+        "skills (list of strings), experience (list of strings)."
+        "\n\n" + document_type + ":\n" + text +
+        "\n\nRespond ONLY with the JSON object."
+    )
+
+
+def build_match_prompt(job_profile: DocumentProfile, resume_profile: DocumentProfile) -> str:
+    """
+    Constructs the prompt for the LLM to match a candidate profile against a job description profile.
+    Args:
+        job_profile (DocumentProfile): Skills and experience required by the job description.
+        resume_profile (DocumentProfile): Skills and experience of the candidate.
+    Returns:
+        str: The constructed prompt.
+    """
+    return (
+        "You are an expert HR assistant. Compare the candidate's skills and experience against the job requirements. "
+        "Output a JSON object with the following fields: "
+        "matching_score (0-100), matched_skills (list), missing_skills (list), matched_experience (list), "
+        "missing_experience (list), summary (string)."
+        "\n\nJob Requirements:\n" + job_profile.model_dump_json() +
+        "\n\nCandidate Profile:\n" + resume_profile.model_dump_json() +
+        "\n\nRespond ONLY with the JSON object."
+    )
+
+
+def build_resume_match_prompt(job_profile: DocumentProfile, resume: str) -> str:
+    """
+    Constructs a single-call prompt matching a full resume against an already extracted job profile.
+    Used for Batch API jobs, where each candidate must be analyzed in one request.
+    Args:
+        job_profile (DocumentProfile): Skills and experience required by the job description.
         resume (str): The candidate's resume text.
     Returns:
         str: The constructed prompt.
     """
     return (
-        "You are an expert HR assistant. Analyze the following candidate resume against the job description. "
+        "You are an expert HR assistant. Analyze the following candidate resume against the job requirements. "
         "Extract and compare skills and experience. Output a JSON object with the following fields: "
         "matching_score (0-100), matched_skills (list), missing_skills (list), matched_experience (list), "
         "missing_experience (list), summary (string)."
-        "\n\nJob Description:\n" + job_desc +
+        "\n\nJob Requirements:\n" + job_profile.model_dump_json() +
         "\n\nCandidate Resume:\n" + resume +
         "\n\nRespond ONLY with the JSON object."
     )
 
 
-def extract_json_from_llm_output(text: str) -> str:
+def _format_messages(input_prompt: str) -> List[Any]:
     """
-    Removes Markdown code block markers (``` or ```json) from LLM output.
+    Wraps a human prompt with the JSON-only system instruction.
     Args:
-        text (str): Raw LLM output.
+        input_prompt (str): The human prompt.
     Returns:
-        str: Cleaned JSON string.
+        List[Any]: The formatted chat messages.
     """
-    # Remove triple backticks and optional 'json' after them
-    cleaned = re.sub(r"^```(?:json)?\s*|```$", "", text.strip(), flags=re.IGNORECASE | re.MULTILINE)
-    return cleaned.strip()
+    prompt_template = ChatPromptTemplate.from_messages([
+        ("system", SYSTEM_PROMPT),
+        ("human", "{input_prompt}")
+    ])
+    return prompt_template.format_messages(input_prompt=input_prompt)
 
 
-def analyze_resume(job_desc: str, resume: str, model_name: str = "gpt-3.5-turbo") -> AnalysisResult:
+def _build_cost_estimate(
+    usages: List[Dict[str, int]], cost_per_1k_tokens: float = COST_PER_1K_TOKENS
+) -> Dict[str, Any]:
+    """
+    Sums the token usage of the LLM calls made for one analysis and logs the resulting cost.
+    Args:
+        usages (List[Dict[str, int]]): Token usage reported for each call.
+        cost_per_1k_tokens (float): Price per 1K tokens (lower for Batch API calls).
+    Returns:
+        Dict[str, Any]: The cost estimate attached to the AnalysisResult.
     """
-    Analyzes the resume against the job description using OpenAI LLM via LangChain.
+    prompt_tokens = sum(usage.get("prompt_tokens", 0) for usage in usages)
+    completion_tokens = sum(usage.get("completion_tokens", 0) for usage in usages)
+    total_tokens = prompt_tokens + completion_tokens
+    usd_cost = total_tokens / 1000 * cost_per_1k_tokens
+    logger.info(
+        "Prompt tokens: %d, Completion tokens: %d, Total: %d, Cost: $%.4f",
+        prompt_tokens, completion_tokens, total_tokens, usd_cost,
+    )
+    return {
+        'prompt_tokens': prompt_tokens,
+        'completion_tokens': completion_tokens,
+        'total_tokens': total_tokens,
+        'usd': round(usd_cost, 6)
+    }
+
+
+def _fit_to_context(input_prompt: str, model_name: str) -> str:
+    """
+    Trims an over-long prompt to fit the model's context window, keeping the head and tail of the prompt
+    (instructions and the start and end of the document) and dropping the middle.
+    Args:
+        input_prompt (str): The human prompt.
+        model_name (str): The OpenAI model to use.
+    Returns:
+        str: The prompt, truncated if it exceeds the token budget.
+    """
+    max_tokens = MODEL_CONTEXT_LIMITS.get(model_name, DEFAULT_CONTEXT_LIMIT) - COMPLETION_TOKEN_RESERVE
+    if count_tokens(input_prompt, model=model_name) <= max_tokens:
+        return input_prompt
+    enc = _get_encoder(model_name)
+    tokens = enc.encode(input_prompt)
+    logger.warning("Prompt of %d tokens exceeds the %d token budget for %s, truncating", len(tokens), max_tokens, model_name)
+    half = max_tokens // 2
+    return enc.decode(tokens[:half] + tokens[-half:])
+
+
+def _insufficient_resume_result() -> AnalysisResult:
+    """
+    Returns the zero-score result used for resumes too short to analyze, without calling the LLM.
+    Returns:
+        AnalysisResult: The stub analysis result.
+    """
+    return AnalysisResult(
+        matching_score=0,
+        matched_skills=[],
+        missing_skills=[],
+        matched_experience=[],
+        missing_experience=[],
+        summary="Insufficient resume content",
+        cost_estimate={'prompt_tokens': 0, 'completion_tokens': 0, 'total_tokens': 0, 'usd': 0.0},
+    )
+
+
+def _response_cache_key(model_name: str) -> str:
+    """
+    Returns the model-specific part of the response cache key.
+    Args:
+        model_name (str): The OpenAI model to use.
+    Returns:
+        str: The key identifying the model and system prompt.
+    """
+    return f"{model_name}|{SYSTEM_PROMPT}"
+
+
+async def _lookup_response(input_prompt: str, model_name: str) -> Optional[str]:
+    """
+    Returns the cached JSON content for a prompt, if any.
+    Args:
+        input_prompt (str): The human prompt.
+        model_name (str): The OpenAI model to use.
+    Returns:
+        Optional[str]: The cached content, or None on a miss.
+    """
+    cached = await _RESPONSE_CACHE.alookup(input_prompt, _response_cache_key(model_name))
+    return cached[0].text if cached else None
+
+
+async def _store_response(input_prompt: str, model_name: str, content: str) -> None:
+    """
+    Stores validated JSON content for a prompt in the response cache.
+    Args:
+        input_prompt (str): The human prompt.
+        model_name (str): The OpenAI model to use.
+        content (str): The validated JSON content.
+    """
+    await _RESPONSE_CACHE.aupdate(input_prompt, _response_cache_key(model_name), [Generation(text=content)])
+
+
+async def _call_llm(
+    input_prompt: str, model_name: str, response_model: Type[ModelT]
+) -> Tuple[ModelT, Dict[str, int]]:
+    """
+    Sends one JSON-mode prompt to the LLM and returns the validated output with the reported token usage.
+    Responses are cached; cache hits skip the API call and return empty usage.
+    Args:
+        input_prompt (str): The human prompt.
+        model_name (str): The OpenAI model to use.
+        response_model (Type[ModelT]): The Pydantic model to validate the output against.
+    Returns:
+        Tuple[ModelT, Dict[str, int]]: The validated output and the token usage of the call.
+    """
+    input_prompt = _fit_to_context(input_prompt, model_name)
+    cached = await _lookup_response(input_prompt, model_name)
+    if cached is not None:
+        return response_model.model_validate_json(cached), {}
+    prompt = _format_messages(input_prompt)
+    response = await _invoke_with_rate_limit(_get_llm(model_name), prompt, count_tokens(input_prompt, model=model_name))
+    # Exact token usage as reported by the OpenAI API
+    usage = response.response_metadata.get("token_usage", {})
+    output = response_model.model_validate_json(response.content)
+    # Only validated output is cached, so a malformed response is retried on the next call
+    await _store_response(input_prompt, model_name, response.content)
+    return output, usage
+
+
+async def _extract_profile(text: str, document_type: str, model_name: str) -> Tuple[DocumentProfile, Dict[str, int]]:
+    """
+    Extracts the skills/experience profile of one document.
+    Args:
+        text (str): The document text.
+        document_type (str): Human-readable document type.
+        model_name (str): The OpenAI model to use.
+    Returns:
+        Tuple[DocumentProfile, Dict[str, int]]: The validated profile and the token usage of the call.
+    """
+    return await _call_llm(build_extraction_prompt(text, document_type), model_name, DocumentProfile)
+
+
+async def _get_profile(text: str, document_type: str, model_name: str) -> Tuple[DocumentProfile, Dict[str, int]]:
+    """
+    Returns the cached profile of a document, extracting it on first use.
+    Concurrent callers for the same document share a single in-flight LLM call.
+    Args:
+        text (str): The document text.
+        document_type (str): Human-readable document type.
+        model_name (str): The OpenAI model to use.
+    Returns:
+        Tuple[DocumentProfile, Dict[str, int]]: The profile, and the token usage if this call performed the
+        extraction (empty for cache hits, so the cost is only counted once).
+    """
+    profiles = _get_loop_resources().profiles
+    key = (hash(text), document_type, model_name)
+    cached_task = profiles.get(key)
+    is_owner = cached_task is None
+    if cached_task is None:
+        if len(profiles) >= _PROFILE_CACHE_MAX_ENTRIES:
+            # Evict the oldest entry (dicts preserve insertion order)
+            profiles.pop(next(iter(profiles)), None)
+        task = asyncio.ensure_future(_extract_profile(text, document_type, model_name))
+        profiles[key] = task
+    else:
+        task = cached_task
+    try:
+        # Shield so one cancelled caller does not cancel the extraction shared with other callers
+        profile, usage = await asyncio.shield(task)
+    except Exception:
+        # Do not cache failures, so the next call retries the extraction
+        if profiles.get(key) is task:
+            del profiles[key]
+        raise
+    return profile, usage if is_owner else {}
+
+
+async def _match_profiles(
+    job_profile: DocumentProfile, resume_profile: DocumentProfile, model_name: str
+) -> Tuple[AnalysisResult, Dict[str, int]]:
+    """
+    Matches a candidate profile against a job description profile.
+    Args:
+        job_profile (DocumentProfile): Skills and experience required by the job description.
+        resume_profile (DocumentProfile): Skills and experience of the candidate.
+        model_name (str): The OpenAI model to use.
+    Returns:
+        Tuple[AnalysisResult, Dict[str, int]]: The validated analysis result and the token usage of the call.
+    """
+    return await _call_llm(build_match_prompt(job_profile, resume_profile), model_name, AnalysisResult)
+
+
+async def analyze_resume_async(job_desc: str, resume: str, model_name: str = "gpt-3.5-turbo") -> AnalysisResult:
+    """
+    Asynchronously analyzes the resume against the job description using OpenAI LLM via LangChain.
+    Runs as a two-stage chain: the skills/experience profile of each document is extracted (and cached,
+    so a job description is only extracted once per batch), then the two profiles are matched.
     Ensures structured output and returns a validated AnalysisResult.
     Args:
         job_desc (str): The job description text.
@@ -103,39 +680,301 @@ def analyze_resume(job_desc: str, resume: str, model_name: str = "gpt-3.5-turbo"
     Raises:
         RuntimeError: If the LLM call or output parsing fails.
     """
-    parser = PydanticOutputParser(pydantic_object=AnalysisResult)
-    prompt_template = ChatPromptTemplate.from_messages([
-        ("system", "You are an expert HR assistant. Respond only with valid JSON as per the schema."),
-        ("human", "{input_prompt}")
-    ])
-    input_prompt = build_prompt(job_desc, resume)
-    prompt = prompt_template.format_messages(input_prompt=input_prompt)
+    if len(resume.strip()) < MIN_RESUME_CHARS:
+        logger.info("Resume has fewer than %d characters, skipping LLM analysis", MIN_RESUME_CHARS)
+        return _insufficient_resume_result()
+    async with _loop_resources():
+        try:
+            (job_profile, job_usage), (resume_profile, resume_usage) = await asyncio.gather(
+                _get_profile(job_desc, "Job Description", model_name),
+                _get_profile(resume, "Candidate Resume", model_name),
+            )
+            result, match_usage = await _match_profiles(job_profile, resume_profile, model_name)
+            result.cost_estimate = _build_cost_estimate([job_usage, resume_usage, match_usage])
+            return result
+        except ValidationError as ve:
+            logger.error("Output validation error: %s", ve)
+            raise RuntimeError(f"LLM output validation failed: {ve}")
+        except Exception as e:
+            logger.error("LLM analysis failed: %s", e)
+            raise RuntimeError(f"LLM analysis failed: {e}")
 
-    # Token counting for prompt
-    prompt_tokens = count_tokens(input_prompt, model=model_name)
 
-    llm = ChatOpenAI(api_key=OPENAI_API_KEY, model=model_name, temperature=0.3)
+async def stream_analysis_async(
+    job_desc: str, resume: str, model_name: str = "gpt-3.5-turbo"
+) -> AsyncGenerator[Union[str, AnalysisResult], None]:
+    """
+    Asynchronously analyzes the resume against the job description, streaming the match stage as it is generated.
+    Yields the raw JSON content chunks as they arrive, then the validated AnalysisResult parsed from the
+    accumulated buffer as the final item. Shares the response cache with analyze_resume_async; a cached
+    match is yielded as a single chunk.
+    Args:
+        job_desc (str): The job description text.
+        resume (str): The candidate's resume text.
+        model_name (str): The OpenAI model to use (default: gpt-3.5-turbo).
+    Yields:
+        Union[str, AnalysisResult]: Partial JSON content, then the final AnalysisResult.
+    Raises:
+        RuntimeError: If the LLM call or output parsing fails.
+    """
+    if len(resume.strip()) < MIN_RESUME_CHARS:
+        logger.info("Resume has fewer than %d characters, skipping LLM analysis", MIN_RESUME_CHARS)
+        yield _insufficient_resume_result()
+        return
+    async with _loop_resources():
+        try:
+            (job_profile, job_usage), (resume_profile, resume_usage) = await asyncio.gather(
+                _get_profile(job_desc, "Job Description", model_name),
+                _get_profile(resume, "Candidate Resume", model_name),
+            )
+            input_prompt = _fit_to_context(build_match_prompt(job_profile, resume_profile), model_name)
+            match_usage: Dict[str, int] = {}
+            cached = await _lookup_response(input_prompt, model_name)
+            if cached is not None:
+                # Cache hit: emit the whole cached output as a single chunk, at no token cost
+                content = cached
+                yield content
+            else:
+                buffer: List[str] = []
+                async for chunk in _stream_with_rate_limit(
+                    _get_llm(model_name), _format_messages(input_prompt), count_tokens(input_prompt, model=model_name)
+                ):
+                    if chunk.content:
+                        buffer.append(chunk.content)
+                        yield chunk.content
+                    # Token usage arrives on the final chunk of the stream. In JSON mode langchain-openai streams
+                    # through the beta structured-output API, which reports it only in response_metadata.
+                    if chunk.usage_metadata:
+                        match_usage = {
+                            'prompt_tokens': chunk.usage_metadata.get("input_tokens", 0),
+                            'completion_tokens': chunk.usage_metadata.get("output_tokens", 0),
+                        }
+                    elif chunk.response_metadata.get("token_usage"):
+                        match_usage = chunk.response_metadata["token_usage"]
+                content = "".join(buffer)
+            result = AnalysisResult.model_validate_json(content)
+            if cached is None:
+                await _store_response(input_prompt, model_name, content)
+            result.cost_estimate = _build_cost_estimate([job_usage, resume_usage, match_usage])
+        except ValidationError as ve:
+            logger.error("Output validation error: %s", ve)
+            raise RuntimeError(f"LLM output validation failed: {ve}")
+        except Exception as e:
+            logger.error("LLM analysis failed: %s", e)
+            raise RuntimeError(f"LLM analysis failed: {e}")
+        yield result
+
+
+async def analyze_resumes(
+    pairs: List[Tuple[str, str]],
+    model_name: str = "gpt-3.5-turbo",
+    max_concurrency: int = MAX_CONCURRENT_REQUESTS,
+) -> List[Optional[AnalysisResult]]:
+    """
+    Analyzes many (job description, resume) pairs concurrently.
+    A semaphore bounds the number of pairs analyzed at once; each pair makes up to three LLM calls
+    (two concurrent profile extractions, then a match), so up to 2 x max_concurrency requests can be
+    in flight. The token bucket enforces the actual OpenAI rate limits.
+    Pairs whose analysis failed get None (the error is logged), so one failure does not discard
+    the results already paid for.
+    Args:
+        pairs (List[Tuple[str, str]]): The (job description, resume) text pairs to analyze.
+        model_name (str): The OpenAI model to use (default: gpt-3.5-turbo).
+        max_concurrency (int): Maximum number of pairs analyzed concurrently.
+    Returns:
+        List[Optional[AnalysisResult]]: The analysis results, in the same order as the input pairs
+        (None for pairs whose analysis failed).
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def _bounded(job_desc: str, resume: str) -> AnalysisResult:
+        async with semaphore:
+            return await analyze_resume_async(job_desc, resume, model_name)
+
+    # Hold the loop's resources across the whole batch so pairs share one connection pool and profile cache
+    async with _loop_resources():
+        outcomes = await asyncio.gather(
+            *[_bounded(job_desc, resume) for job_desc, resume in pairs], return_exceptions=True
+        )
+    results: List[Optional[AnalysisResult]] = []
+    for index, outcome in enumerate(outcomes):
+        if isinstance(outcome, BaseException):
+            if not isinstance(outcome, Exception):
+                # Propagate cancellation and other non-error exceptions
+                raise outcome
+            logger.error("Analysis of pair %d failed: %s", index, outcome)
+            results.append(None)
+        else:
+            results.append(outcome)
+    return results
+
+
+def analyze_resume(job_desc: str, resume: str, model_name: str = "gpt-3.5-turbo") -> AnalysisResult:
+    """
+    Synchronous wrapper around analyze_resume_async for the CLI and Flask entry points.
+    Args:
+        job_desc (str): The job description text.
+        resume (str): The candidate's resume text.
+        model_name (str): The OpenAI model to use (default: gpt-3.5-turbo).
+    Returns:
+        AnalysisResult: The structured analysis result.
+    Raises:
+        RuntimeError: If the LLM call or output parsing fails.
+    """
+    return _run_sync(analyze_resume_async(job_desc, resume, model_name))
+
+
+def stream_analysis(
+    job_desc: str, resume: str, model_name: str = "gpt-3.5-turbo"
+) -> Iterator[Union[str, AnalysisResult]]:
+    """
+    Synchronous wrapper around stream_analysis_async for the Flask streaming endpoint.
+    Args:
+        job_desc (str): The job description text.
+        resume (str): The candidate's resume text.
+        model_name (str): The OpenAI model to use (default: gpt-3.5-turbo).
+    Yields:
+        Union[str, AnalysisResult]: Partial JSON content, then the final AnalysisResult.
+    Raises:
+        RuntimeError: If the LLM call or output parsing fails.
+    """
+    return _iterate_sync(stream_analysis_async(job_desc, resume, model_name))
+
+
+def analyze_resumes_sync(
+    pairs: List[Tuple[str, str]],
+    model_name: str = "gpt-3.5-turbo",
+    max_concurrency: int = MAX_CONCURRENT_REQUESTS,
+) -> List[Optional[AnalysisResult]]:
+    """
+    Synchronous wrapper around analyze_resumes.
+    Args:
+        pairs (List[Tuple[str, str]]): The (job description, resume) text pairs to analyze.
+        model_name (str): The OpenAI model to use (default: gpt-3.5-turbo).
+        max_concurrency (int): Maximum number of pairs analyzed concurrently.
+    Returns:
+        List[Optional[AnalysisResult]]: The analysis results, in the same order as the input pairs
+        (None for pairs whose analysis failed).
+    """
+    return _run_sync(analyze_resumes(pairs, model_name, max_concurrency))
+
+
+def analyze_resumes_batch(
+    job_desc: str,
+    resumes: List[str],
+    model_name: str = "gpt-3.5-turbo",
+    poll_interval: float = BATCH_POLL_INTERVAL_SECONDS,
+) -> List[Optional[AnalysisResult]]:
+    """
+    Screens many resumes against one job description with the OpenAI Batch API.
+    The job description profile is extracted once on demand; each candidate is then matched in a single
+    request of one batch job, which is billed at half price but may take up to 24 hours to complete.
+    Candidates whose request failed get None (the reason is logged), so one failure does not discard
+    the results already paid for.
+    Args:
+        job_desc (str): The job description text.
+        resumes (List[str]): The candidate resume texts.
+        model_name (str): The OpenAI model to use (default: gpt-3.5-turbo).
+        poll_interval (float): Seconds between batch status checks.
+    Returns:
+        List[Optional[AnalysisResult]]: The analysis results, in the same order as the input resumes
+        (None for candidates whose request failed).
+    Raises:
+        RuntimeError: If the batch job cannot be submitted or produced no output at all.
+    """
+    # Resumes too short to analyze get a stub result instead of a batch request
+    results: Dict[str, Optional[AnalysisResult]] = {
+        f"c{i}": _insufficient_resume_result()
+        for i, resume in enumerate(resumes)
+        if len(resume.strip()) < MIN_RESUME_CHARS
+    }
+    custom_ids = [f"c{i}" for i in range(len(resumes))]
+    if len(results) == len(resumes):
+        return [results[custom_id] for custom_id in custom_ids]
     try:
-        response = llm(prompt)
-        # Clean LLM output
-        cleaned_output = extract_json_from_llm_output(response.content)
-        # Token counting for completion
-        completion_tokens = count_tokens(response.content, model=model_name)
-        total_tokens = prompt_tokens + completion_tokens
-        usd_cost = total_tokens / 1000 * COST_PER_1K_TOKENS
-        logger.info(f"Prompt tokens: {prompt_tokens}, Completion tokens: {completion_tokens}, Total: {total_tokens}, Cost: ${usd_cost:.4f}")
-        # Parse and validate output
-        result = parser.parse(cleaned_output)
-        result.cost_estimate = {
-            'prompt_tokens': prompt_tokens,
-            'completion_tokens': completion_tokens,
-            'total_tokens': total_tokens,
-            'usd': round(usd_cost, 6)
-        }
-        return result
+        job_profile, job_usage = _run_sync(_get_profile(job_desc, "Job Description", model_name))
+        if job_usage:
+            # Log the cost of the on-demand job description extraction
+            _build_cost_estimate([job_usage])
+
+        requests: List[Dict[str, Any]] = [
+            {
+                "custom_id": f"c{i}",
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": {
+                    "model": model_name,
+                    "temperature": 0.3,
+                    "response_format": {"type": "json_object"},
+                    "messages": [
+                        {"role": "system", "content": SYSTEM_PROMPT},
+                        {"role": "user", "content": _fit_to_context(build_resume_match_prompt(job_profile, resume), model_name)},
+                    ],
+                },
+            }
+            for i, resume in enumerate(resumes)
+            if f"c{i}" not in results
+        ]
+        client = openai.OpenAI(api_key=OPENAI_API_KEY)
+        batch_input = b"\n".join(orjson.dumps(request) for request in requests)
+        input_file = client.files.create(file=("resume_batch.jsonl", batch_input), purpose="batch")
+        batch = client.batches.create(
+            input_file_id=input_file.id, endpoint="/v1/chat/completions", completion_window="24h"
+        )
+        logger.info("Submitted batch %s with %d requests", batch.id, len(requests))
+
+        while batch.status not in ("completed", "failed", "expired", "cancelled"):
+            time.sleep(poll_interval)
+            batch = client.batches.retrieve(batch.id)
+            logger.info("Batch %s status: %s", batch.id, batch.status)
+        if not batch.output_file_id and not batch.error_file_id:
+            raise RuntimeError(f"Batch {batch.id} ended with status '{batch.status}' and no output")
+        if batch.status != "completed":
+            logger.error("Batch %s ended with status '%s', collecting partial results", batch.id, batch.status)
+
+        errors: Dict[str, str] = {}
+        if batch.error_file_id:
+            for line in client.files.content(batch.error_file_id).text.splitlines():
+                if line.strip():
+                    output = orjson.loads(line)
+                    errors[output["custom_id"]] = str(
+                        output.get("error") or (output.get("response") or {}).get("body", {}).get("error")
+                    )
+        if batch.output_file_id:
+            for line in client.files.content(batch.output_file_id).text.splitlines():
+                if not line.strip():
+                    continue
+                output = orjson.loads(line)
+                custom_id = output["custom_id"]
+                response = output.get("response") or {}
+                if output.get("error") or response.get("status_code") != 200:
+                    errors[custom_id] = str(output.get("error") or response.get("body", {}).get("error"))
+                    continue
+                body = response["body"]
+                try:
+                    result = AnalysisResult.model_validate_json(body["choices"][0]["message"]["content"])
+                except ValidationError as ve:
+                    errors[custom_id] = f"output validation failed: {ve}"
+                    continue
+                result.cost_estimate = _build_cost_estimate(
+                    [body.get("usage", {})], cost_per_1k_tokens=COST_PER_1K_TOKENS * BATCH_COST_MULTIPLIER
+                )
+                results[custom_id] = result
+
+        for request in requests:
+            custom_id = request["custom_id"]
+            if custom_id not in results:
+                logger.error(
+                    "Batch request %s (resume %d) failed: %s",
+                    custom_id, int(custom_id[1:]), errors.get(custom_id, "no result returned"),
+                )
+        return [results.get(custom_id) for custom_id in custom_ids]
     except ValidationError as ve:
-        logger.error(f"Output validation error: {ve}")
+        logger.error("Output validation error: %s", ve)
         raise RuntimeError(f"LLM output validation failed: {ve}")
+    except RuntimeError as e:
+        logger.error("Batch analysis failed: %s", e)
+        raise
     except Exception as e:
-        logger.error(f"LLM analysis failed: {e}")
-        raise RuntimeError(f"LLM analysis failed: {e}") 
\ No newline at end of file
+        logger.error("Batch analysis failed: %s", e)
+        raise RuntimeError(f"Batch analysis failed: {e}")
@@ -7,8 +7,11 @@ Accepts file paths for job description and resume, processes them, analyzes with
 
 import argparse
 import logging
+import os
+from typing import List, Optional
+from concurrent.futures import ThreadPoolExecutor
 from resume_parser import parse_input, InputValidationError
-from llm_orchestrator import analyze_resume, AnalysisResult
+from llm_orchestrator import analyze_resume, analyze_resumes_batch, AnalysisResult
 from output_formatter import format_result_as_json, save_result_to_file, format_human_readable_summary
 
 logging.basicConfig(level=logging.INFO)
@@ -19,42 +22,65 @@ def main():
         description="AI Resume System: Analyze a candidate's resume against a job description using OpenAI LLM."
     )
     parser.add_argument('--job', required=True, help='Path to the job description file (PDF, DOCX, or TXT)')
-    parser.add_argument('--resume', required=True, help='Path to the candidate resume file (PDF, DOCX, or TXT)')
-    parser.add_argument('--output', required=False, help='Path to save the output JSON file')
+    parser.add_argument('--resume', required=True, nargs='+', help='Path to the candidate resume file (PDF, DOCX, or TXT); several paths with --batch')
+    parser.add_argument('--output', required=False, help='Path to save the output JSON file (a directory with --batch)')
+    parser.add_argument('--batch', action='store_true', help='Screen all resumes in one OpenAI Batch API job (cheaper, may take hours)')
     args = parser.parse_args()
+    if len(args.resume) > 1 and not args.batch:
+        parser.error("Multiple resumes require --batch")
 
     try:
-        logger.info("Extracting and sanitizing job description...")
-        job_desc = parse_input(args.job)
-        logger.info("Extracting and sanitizing candidate resume...")
-        resume = parse_input(args.resume)
+        logger.info("Extracting and sanitizing job description and candidate resumes...")
+        with ThreadPoolExecutor(max_workers=min(8, len(args.resume) + 1)) as executor:
+            job_future = executor.submit(parse_input, args.job)
+            resume_futures = [executor.submit(parse_input, path) for path in args.resume]
+            job_desc = job_future.result()
+            resumes = [future.result() for future in resume_futures]
     except InputValidationError as e:
-        logger.error(f"Input error: {e}")
+        logger.error("Input error: %s", e)
         print(f"Input error: {e}")
         return
     except Exception as e:
-        logger.error(f"Unexpected error during input parsing: {e}")
+        logger.error("Unexpected error during input parsing: %s", e)
         print(f"Unexpected error: {e}")
         return
 
     try:
-        logger.info("Analyzing resume against job description using LLM...")
-        result: AnalysisResult = analyze_resume(job_desc, resume)
+        if args.batch:
+            logger.info("Submitting %d resumes to the OpenAI Batch API...", len(resumes))
+            results: List[Optional[AnalysisResult]] = analyze_resumes_batch(job_desc, resumes)
+        else:
+            logger.info("Analyzing resume against job description using LLM...")
+            results = [analyze_resume(job_desc, resumes[0])]
     except Exception as e:
-        logger.error(f"LLM analysis error: {e}")
+        logger.error("LLM analysis error: %s", e)
         print(f"LLM analysis error: {e}")
         return
 
-    print(format_human_readable_summary(result))
-    print("\nFull JSON Output:\n")
-    print(format_result_as_json(result))
+    for resume_path, result in zip(args.resume, results):
+        if args.batch:
+            print(f"\n### {resume_path}")
+        if result is None:
+            print("Analysis failed (see log for details).")
+            continue
+        print(format_human_readable_summary(result))
+        print("\nFull JSON Output:\n")
+        print(format_result_as_json(result))
 
     if args.output:
         try:
-            save_result_to_file(result, args.output)
+            if args.batch:
+                os.makedirs(args.output, exist_ok=True)
+                for resume_path, result in zip(args.resume, results):
+                    if result is None:
+                        continue
+                    stem = os.path.splitext(os.path.basename(resume_path))[0]
+                    save_result_to_file(result, os.path.join(args.output, f"{stem}.json"))
+            else:
+                save_result_to_file(results[0], args.output)
         except Exception as e:
-            logger.error(f"Failed to save output: {e}")
+            logger.error("Failed to save output: %s", e)
             print(f"Failed to save output: {e}")
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
@@ -5,26 +5,25 @@ Module for formatting and exporting the results of the LLM analysis.
 Provides functions for pretty-printing, saving to file, and generating human-readable summaries.
 """
 
-import json
+import orjson
 from typing import Any
 from llm_orchestrator import AnalysisResult
 import logging
 
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 def format_result_as_json(result: AnalysisResult) -> str:
     """
-    Formats the AnalysisResult as a pretty-printed JSON string.
+    Formats the AnalysisResult as a pretty-printed JSON string (serialized with orjson).
     Args:
         result (AnalysisResult): The analysis result object.
     Returns:
         str: Pretty-printed JSON string.
     """
     try:
-        return result.model_dump_json(indent=2)
+        return orjson.dumps(result.model_dump(), option=orjson.OPT_INDENT_2).decode()
     except Exception as e:
-        logger.error(f"Failed to format result as JSON: {e}")
+        logger.error("Failed to format result as JSON: %s", e)
         raise
 
 def save_result_to_file(result: AnalysisResult, file_path: str) -> None:
@@ -39,9 +38,9 @@ def save_result_to_file(result: AnalysisResult, file_path: str) -> None:
     try:
         with open(file_path, 'w', encoding='utf-8') as f:
             f.write(format_result_as_json(result))
-        logger.info(f"Result saved to {file_path}")
+        logger.info("Result saved to %s", file_path)
     except Exception as e:
-        logger.error(f"Failed to save result to file: {e}")
+        logger.error("Failed to save result to file: %s", e)
         raise
 
 def format_human_readable_summary(result: AnalysisResult) -> str:
@@ -65,5 +64,5 @@ def format_human_readable_summary(result: AnalysisResult) -> str:
         )
         return summary
     except Exception as e:
-        logger.error(f"Failed to generate human-readable summary: {e}")
+        logger.error("Failed to generate human-readable summary: %s", e)
         raise 
\ No newline at end of file
@@ -7,80 +7,142 @@ Implements prompt injection prevention and robust error handling.
 """
 
 import os
-from typing import Optional
+import re
+from io import BytesIO
+from typing import IO, Optional, Union
 import logging
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
 from pypdf import PdfReader
 from docx import Document
-from bs4 import BeautifulSoup
+import lxml.html
+from lxml.etree import ParserError
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 SUPPORTED_EXTENSIONS = {'.pdf', '.docx', '.txt'}
 
+# Suspicious prompt tokens stripped from input, and whitespace runs to collapse
+_PROMPT_TOKEN_RE = re.compile(r'###|>>>|User:|Assistant:|System:|```')
+_WHITESPACE_RE = re.compile(r'\s+')
+
+# PDFs with at least this many pages are extracted in parallel worker processes
+PARALLEL_PDF_MIN_PAGES = 8
+MAX_PDF_WORKERS = min(8, os.cpu_count() or 1)
+
+# Shared worker pool for PDF extraction, created on first use. Workers are started with forkserver/spawn
+# rather than fork, since the app forks from a multi-threaded process (request threads, LLM event loop).
+_PDF_POOL: Optional[ProcessPoolExecutor] = None
+_PDF_POOL_LOCK = threading.Lock()
+
 class InputValidationError(Exception):
     """Custom exception for input validation errors."""
     pass
 
-def extract_text_from_pdf(file_path: str) -> str:
+def _extract_pdf_page_range(source: Union[str, bytes], start: int, stop: int) -> str:
+    """
+    Extracts text from a contiguous range of PDF pages. Runs in a worker process,
+    so it opens its own reader rather than sharing one across workers.
+    Args:
+        source (Union[str, bytes]): Path to the PDF file, or its raw bytes.
+        start (int): Index of the first page to extract.
+        stop (int): Index one past the last page to extract.
+    Returns:
+        str: Extracted text of the page range.
+    """
+    reader = PdfReader(BytesIO(source) if isinstance(source, bytes) else source)
+    return "\n".join(reader.pages[i].extract_text() or '' for i in range(start, stop))
+
+def _get_pdf_pool() -> ProcessPoolExecutor:
+    """
+    Returns the shared PDF extraction pool, creating it on first use.
+    The pool is bounded by MAX_PDF_WORKERS regardless of how many documents are parsed concurrently.
+    Returns:
+        ProcessPoolExecutor: The shared pool.
+    """
+    global _PDF_POOL
+    with _PDF_POOL_LOCK:
+        if _PDF_POOL is None:
+            start_method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+            _PDF_POOL = ProcessPoolExecutor(
+                max_workers=MAX_PDF_WORKERS, mp_context=multiprocessing.get_context(start_method)
+            )
+    return _PDF_POOL
+
+def extract_text_from_pdf(source: Union[str, IO[bytes]]) -> str:
     """
     Extracts text from a PDF file.
+    Long documents are split into page ranges extracted in parallel by the shared worker pool,
+    since pypdf text extraction is CPU-bound pure Python.
     Args:
-        file_path (str): Path to the PDF file.
+        source (Union[str, IO[bytes]]): Path to the PDF file, or a binary stream of it.
     Returns:
         str: Extracted text.
     Raises:
         InputValidationError: If the file cannot be read or is empty.
     """
     try:
-        reader = PdfReader(file_path)
-        text = "\n".join(page.extract_text() or '' for page in reader.pages)
+        # Workers need a picklable source, so read a stream into bytes once
+        pdf_source: Union[str, bytes] = source if isinstance(source, str) else source.read()
+        reader = PdfReader(BytesIO(pdf_source) if isinstance(pdf_source, bytes) else pdf_source)
+        num_pages = len(reader.pages)
+        workers = min(MAX_PDF_WORKERS, num_pages)
+        if num_pages < PARALLEL_PDF_MIN_PAGES or workers < 2:
+            text = "\n".join(page.extract_text() or '' for page in reader.pages)
+        else:
+            chunk = -(-num_pages // workers)
+            starts = list(range(0, num_pages, chunk))
+            stops = [min(start + chunk, num_pages) for start in starts]
+            text = "\n".join(_get_pdf_pool().map(_extract_pdf_page_range, [pdf_source] * len(starts), starts, stops))
         if not text.strip():
             raise InputValidationError("PDF file contains no extractable text.")
         return text
     except Exception as e:
-        logger.error(f"Failed to extract text from PDF: {e}")
+        logger.error("Failed to extract text from PDF: %s", e)
         raise InputValidationError(f"PDF extraction error: {e}")
 
-def extract_text_from_docx(file_path: str) -> str:
+def extract_text_from_docx(source: Union[str, IO[bytes]]) -> str:
     """
     Extracts text from a DOCX file.
     Args:
-        file_path (str): Path to the DOCX file.
+        source (Union[str, IO[bytes]]): Path to the DOCX file, or a binary stream of it.
     Returns:
         str: Extracted text.
     Raises:
         InputValidationError: If the file cannot be read or is empty.
     """
     try:
-        doc = Document(file_path)
+        doc = Document(source)
         text = "\n".join([para.text for para in doc.paragraphs])
         if not text.strip():
             raise InputValidationError("DOCX file contains no extractable text.")
         return text
     except Exception as e:
-        logger.error(f"Failed to extract text from DOCX: {e}")
+        logger.error("Failed to extract text from DOCX: %s", e)
         raise InputValidationError(f"DOCX extraction error: {e}")
 
-def extract_text_from_txt(file_path: str) -> str:
+def extract_text_from_txt(source: Union[str, IO[bytes]]) -> str:
     """
     Extracts text from a TXT file.
     Args:
-        file_path (str): Path to the TXT file.
+        source (Union[str, IO[bytes]]): Path to the TXT file, or a binary stream of it.
     Returns:
         str: Extracted text.
     Raises:
         InputValidationError: If the file cannot be read or is empty.
     """
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            text = f.read()
+        if isinstance(source, str):
+            with open(source, 'r', encoding='utf-8') as f:
+                text = f.read()
+        else:
+            text = source.read().decode('utf-8')
         if not text.strip():
             raise InputValidationError("TXT file is empty.")
         return text
     except Exception as e:
-        logger.error(f"Failed to extract text from TXT: {e}")
+        logger.error("Failed to extract text from TXT: %s", e)
         raise InputValidationError(f"TXT extraction error: {e}")
 
 def sanitize_text(text: str) -> str:
@@ -94,53 +156,70 @@ def sanitize_text(text: str) -> str:
     Returns:
         str: Sanitized text.
     """
-    # Remove HTML tags
-    soup = BeautifulSoup(text, 'lxml')
-    clean_text = soup.get_text()
-    # Remove suspicious prompt tokens
-    for token in ['###', '>>>', 'User:', 'Assistant:', 'System:', '```']:
-        clean_text = clean_text.replace(token, '')
+    # Remove HTML tags (only parse when the text can actually contain markup)
+    clean_text = text
+    if '<' in text and '>' in text:
+        try:
+            clean_text = lxml.html.fromstring(text).text_content()
+        except (ParserError, ValueError) as e:
+            logger.warning("HTML stripping skipped: %s", e)
+    # Remove suspicious prompt tokens, repeating until none are left, since stripping one token can
+    # join the surrounding text into another (e.g. 'Sys###tem:' -> 'System:')
+    removed = 1
+    while removed:
+        clean_text, removed = _PROMPT_TOKEN_RE.subn('', clean_text)
     # Collapse excessive whitespace
-    clean_text = ' '.join(clean_text.split())
-    return clean_text
+    return _WHITESPACE_RE.sub(' ', clean_text).strip()
 
-def validate_input(file_path: str) -> None:
+def validate_input(source: Union[str, IO[bytes]], filename: Optional[str] = None) -> None:
     """
     Validates the input file for existence, supported extension, and non-empty content.
     Args:
-        file_path (str): Path to the input file.
+        source (Union[str, IO[bytes]]): Path to the input file, or a seekable binary stream of it.
+        filename (Optional[str]): Original file name, used for the extension when source is a stream.
     Raises:
         InputValidationError: If validation fails.
     """
-    if not os.path.isfile(file_path):
-        raise InputValidationError(f"File does not exist: {file_path}")
-    ext = os.path.splitext(file_path)[1].lower()
+    if isinstance(source, str):
+        if not os.path.isfile(source):
+            raise InputValidationError(f"File does not exist: {source}")
+        filename = filename or source
+    ext = os.path.splitext(filename or '')[1].lower()
     if ext not in SUPPORTED_EXTENSIONS:
         raise InputValidationError(f"Unsupported file extension: {ext}")
-    if os.path.getsize(file_path) == 0:
+    if isinstance(source, str):
+        size = os.path.getsize(source)
+    else:
+        position = source.tell()
+        size = source.seek(0, os.SEEK_END) - position
+        source.seek(position)
+    if size == 0:
         raise InputValidationError("File is empty.")
 
-def parse_input(file_path: str) -> str:
+def parse_input(source: Union[str, IO[bytes]], filename: Optional[str] = None) -> str:
     """
     Main entry point for extracting and sanitizing text from a file.
+    Accepts either a path on disk or an in-memory binary stream (e.g. an uploaded file),
+    so uploads can be parsed without first being written to disk.
     Args:
-        file_path (str): Path to the input file.
+        source (Union[str, IO[bytes]]): Path to the input file, or a seekable binary stream of it.
+        filename (Optional[str]): Original file name, used for the extension when source is a stream.
     Returns:
         str: Clean, validated, and sanitized text ready for LLM processing.
     Raises:
         InputValidationError: If extraction or validation fails.
     """
-    validate_input(file_path)
-    ext = os.path.splitext(file_path)[1].lower()
+    validate_input(source, filename)
+    ext = os.path.splitext(filename or (source if isinstance(source, str) else ''))[1].lower()
     if ext == '.pdf':
-        raw_text = extract_text_from_pdf(file_path)
+        raw_text = extract_text_from_pdf(source)
     elif ext == '.docx':
-        raw_text = extract_text_from_docx(file_path)
+        raw_text = extract_text_from_docx(source)
     elif ext == '.txt':
-        raw_text = extract_text_from_txt(file_path)
+        raw_text = extract_text_from_txt(source)
     else:
         raise InputValidationError(f"Unsupported file extension: {ext}")
     sanitized = sanitize_text(raw_text)
     if not sanitized:
         raise InputValidationError("Sanitized text is empty.")
-    return sanitized 
\ No newline at end of file
+    return sanitized